@@ -43,9 +43,9 @@ else:
 MAKEFILE_PATH = os.environ.get('MAKEFILE_PATH', os.path.join(CONSTANTS_FILE_ABOSLUTE_PATH, "../Makefile"))
 CONFIG_YAML_DIR = os.path.dirname(os.path.abspath(CONFIG_YAML_PATH))
 
-# Read the YAML file
+# Read the YAML file, with libyaml's C parser when PyYAML was built with it
 with open(CONFIG_YAML_PATH, "r") as file:
-    CONFIG = yaml.load(file, Loader=yaml.FullLoader)
+    CONFIG = yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
 
 ABSOLUTE_PATH_ENV_VARIABLES = [
     'REPO_ROOT',
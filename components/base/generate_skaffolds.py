@@ -1,12 +1,15 @@
 import glob
 import os
 import yaml
-from typing import List, Optional, Set
-
-from ilio import write
+from pathlib import Path
+from typing import Callable, List, Optional, Set
 
 from .component_types import Component
 from .constants import *
+from .utils import prune_stale_files, reset_created_dirs, sync_tree, tree_digest, write_file
+
+# Digest of the generated tree, kept in GENERATED_SKAFFOLD_DIR to detect unchanged runs
+_MANIFEST_NAME = ".manifest"
 
 
 def _get_component_id(component: Component) -> str:
@@ -62,7 +65,7 @@ def generate_skaffolds(components: List[Component]):
                 })
 
         if not os.path.isfile(f"{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}/skaffold.yaml"):
-            write(f"{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}/skaffold.yaml", yaml.dump({
+            write_file(f"{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}/skaffold.yaml", yaml.dump({
                 "apiVersion": "skaffold/v3",
                 "kind": "Config",
                 "requires": skaffold_paths,
@@ -73,9 +76,66 @@ def generate_skaffolds(components: List[Component]):
         })
     # Determine the output path for the main skaffold file
     main_skaffold_dir = GENERATED_SKAFFOLD_TMP_DIR
-    write(f"{main_skaffold_dir}/skaffold--main--all.yaml", yaml.dump({
+    write_file(f"{main_skaffold_dir}/skaffold--main--all.yaml", yaml.dump({
         "apiVersion": "skaffold/v3",
         "kind": "Config",
         "requires": global_skaffold_paths,
     }))
 
+
+def generate_environment(config: dict, create_components: Callable[[dict], List[Component]]):
+    """
+    Generate all skaffolds of an environment and sync them to GENERATED_SKAFFOLD_DIR.
+
+    The steps around the component graph are the same for every environment:
+    build the components in the scratch directory, drop what the previous
+    run left there, write the skaffold indexes and IntelliJ run configurations,
+    then sync the result. The sync is skipped when the generated tree is
+    identical to the one synced last time.
+
+    The scratch directory is kept between runs so unchanged files are simply
+    overwritten. Files are told apart by their modification time against the
+    .gitkeep marker touched at the start of the run.
+
+    Args:
+        config: The parsed environment config
+        create_components: Callable taking the config and returning the components to deploy
+    """
+    # Reuse the temporary directory; .gitkeep marks the start of this run
+    os.makedirs(GENERATED_SKAFFOLD_TMP_DIR, exist_ok=True)
+    marker = Path(GENERATED_SKAFFOLD_TMP_DIR, '.gitkeep')
+    marker.touch()
+    run_started_ns = marker.stat().st_mtime_ns
+
+    components = create_components(config)
+
+    # Remove files left by previous runs before they get listed in the skaffold indexes
+    prune_stale_files(GENERATED_SKAFFOLD_TMP_DIR, run_started_ns)
+    reset_created_dirs()
+
+    # Generate skaffold configurations
+    generate_skaffolds(
+        components=components,
+    )
+
+    # Generate IntelliJ run configurations if enabled
+    env_vars = config.get('env', {})
+    if INTELLIJ_RUN_CONFIGURATIONS_ENABLED or env_vars.get('INTELLIJ_RUN_CONFIGURATIONS_ENABLED', '').lower() == 'true':
+        from ..intellij_skaffolds_run_configurations.main import generate_intelij_skaffolds_run_configurations
+        generate_intelij_skaffolds_run_configurations()
+
+    # Sync generated files to the final directory, unless they match the last sync
+    digest = tree_digest(GENERATED_SKAFFOLD_TMP_DIR)
+    manifest_path = os.path.join(GENERATED_SKAFFOLD_DIR, _MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r") as f:
+            synced_digest = f.read()
+    except OSError:
+        synced_digest = None
+    if digest != synced_digest:
+        # Drop the old digest first and record the new one only once the sync has
+        # completed, so an interrupted sync is redone by the next run
+        if synced_digest is not None:
+            os.unlink(manifest_path)
+        sync_tree(GENERATED_SKAFFOLD_TMP_DIR, GENERATED_SKAFFOLD_DIR)
+        write_file(manifest_path, digest)
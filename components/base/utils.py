@@ -1,5 +1,40 @@
+import filecmp
+import hashlib
 import inspect
+import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+try:
+    # orjson is optional; it serializes straight to bytes
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared pool for independent file writes; threads are started on first use
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="write-files")
+
+# Directories already created by ensure_dir during this process
+_CREATED_DIRS = set()
+
+# libyaml's C emitter when PyYAML was built with it, the pure-Python one otherwise
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class YamlDumper(_SafeDumper):
+    """
+    Safe YAML dumper that writes shared objects out in full.
+
+    Generated values may reference the same dict from several places; the
+    default dumper would emit those as &id001 anchors and *id001 aliases.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
 
 def get_chart_path(chart_name):
     """
@@ -22,6 +57,219 @@ def get_chart_path(chart_name):
     return chart_path
 
 
+def write_file(path, content):
+    """
+    Write content to a file, replacing any existing content.
+
+    The whole content is handed to the OS in one write call, without a
+    buffered file object in between.
+
+    Args:
+        path: Path of the file to write
+        content: Text (written as UTF-8) or bytes to write
+    """
+    data = memoryview(content.encode("utf-8") if isinstance(content, str) else content)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # A regular file normally takes everything at once; loop for short writes
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def dump_yaml(data, path=None):
+    """
+    Serialize data to block-style YAML, keeping the key order of the source dicts.
+
+    Args:
+        data: Object to serialize
+        path: Optional file to write the YAML to
+
+    Returns:
+        The YAML text
+    """
+    content = yaml.dump(data, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
+    if path is not None:
+        write_file(path, content)
+    return content
+
+
+def dump_json(data, indent=False):
+    """
+    Serialize data to UTF-8 encoded JSON, with orjson when it is installed.
+
+    JSON is valid YAML, so the result can also be written to .yaml files.
+
+    Args:
+        data: Object to serialize
+        indent: Indent nested values by two spaces and end with a newline,
+            instead of the compact single-line form
+
+    Returns:
+        The JSON bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE if indent else None
+        return orjson.dumps(data, option=option)
+    if indent:
+        return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_files(files):
+    """
+    Write several independent files concurrently.
+
+    Any error raised by one of the writes is re-raised to the caller.
+
+    Args:
+        files: Iterable of (path, content) pairs
+    """
+    list(_IO_POOL.map(lambda file: write_file(*file), files))
+
+
+def ensure_dir(path):
+    """
+    Create a directory (and its parents) unless it was already created by this process.
+
+    Args:
+        path: Directory path to create
+    """
+    if path in _CREATED_DIRS:
+        return
+    os.makedirs(path, exist_ok=True)
+    _CREATED_DIRS.add(path)
+
+
+def reset_created_dirs():
+    """
+    Forget the directories remembered by ensure_dir.
+
+    Must be called after removing a directory tree that ensure_dir may have created.
+    """
+    _CREATED_DIRS.clear()
+
+
+def sync_tree(src, dst):
+    """
+    Make dst a copy of the src directory tree, touching only what changed.
+
+    Files whose content already matches are left alone, so their timestamps
+    stay stable for anything watching dst. Entries in dst that do not exist
+    in src are deleted.
+
+    Args:
+        src: Source directory
+        dst: Destination directory, created if missing
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(dst) as entries:
+        extraneous = {entry.name: entry for entry in entries}
+
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            current = extraneous.pop(entry.name, None)
+            current_is_dir = current is not None and current.is_dir(follow_symlinks=False)
+
+            if entry.is_dir(follow_symlinks=False):
+                if current is not None and not current_is_dir:
+                    os.unlink(target)
+                sync_tree(entry.path, target)
+                continue
+
+            if current_is_dir:
+                shutil.rmtree(target)
+            elif current is not None and (
+                current.stat(follow_symlinks=False).st_size == entry.stat().st_size
+                and filecmp.cmp(entry.path, target, shallow=False)
+            ):
+                continue
+            shutil.copy2(entry.path, target)
+
+    for entry in extraneous.values():
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _prune_stale_entries(path, since_ns):
+    """
+    Delete the stale files under path, as described in prune_stale_files.
+
+    Returns:
+        A (has_fresh_content, pruned) pair: whether path still holds anything
+        written since since_ns, and whether any stale file was deleted under it
+    """
+    has_fresh_content = False
+    pruned = False
+    with os.scandir(path) as entries:
+        for entry in entries:
+            fresh = entry.stat(follow_symlinks=False).st_mtime_ns >= since_ns
+            if not entry.is_dir(follow_symlinks=False):
+                if fresh:
+                    has_fresh_content = True
+                else:
+                    os.unlink(entry.path)
+                    pruned = True
+                continue
+
+            child_has_fresh_content, child_pruned = _prune_stale_entries(entry.path, since_ns)
+            if child_has_fresh_content or fresh:
+                has_fresh_content = True
+            elif child_pruned:
+                # Everything left below it is an empty directory
+                shutil.rmtree(entry.path)
+            pruned = pruned or child_pruned
+    return has_fresh_content, pruned
+
+
+def prune_stale_files(root, since_ns):
+    """
+    Delete the files under root that were last modified before since_ns.
+
+    A directory is deleted with them once it holds nothing written since then,
+    unless it was itself created since then. Directories that never held a
+    stale file are kept even when empty, since components create some of them
+    on purpose.
+
+    Args:
+        root: Directory to prune; it is never deleted itself
+        since_ns: Modification time (st_mtime_ns) that separates fresh files from stale ones
+    """
+    _prune_stale_entries(root, since_ns)
+
+
+def tree_digest(root):
+    """
+    Compute a digest of a directory tree from its relative paths and file contents.
+
+    Two trees with the same digest hold the same directories and files with
+    the same content, so one can stand in for a full comparison of them.
+
+    Args:
+        root: Directory to hash
+
+    Returns:
+        The hex digest
+    """
+    digest = hashlib.blake2b()
+    for dirpath, dirnames, filenames in os.walk(root):
+        # os.walk yields entries in directory order; sort them for a stable digest
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, root)
+        digest.update(f"{rel_dir}/\0".encode("utf-8"))
+        for name in sorted(filenames):
+            rel_path = os.path.normpath(os.path.join(rel_dir, name))
+            with open(os.path.join(dirpath, name), "rb") as f:
+                content = f.read()
+            digest.update(f"{rel_path}\0{len(content)}\0".encode("utf-8"))
+            digest.update(content)
+    return digest.hexdigest()
+
+
 def get_fleet_chart_url(chart_path, git_url="git@github.com:bringes/rke2-cluster", branch="main"):
     """
     Generate a Fleet-compatible git repository URL for a Helm chart.
@@ -4,7 +4,8 @@ Certificate Manager Issuer Component
 This module provides functionality to create a cert-manager issuer
 for DNS01 validation using Cloudflare.
 """
-from typing import List, Optional
+from functools import partial
+from typing import Callable, List, Optional
 
 from ilio import write
 
@@ -12,6 +13,28 @@ from .component_types import IssuerComponent
 from ..base.component_types import Component
 from ..base.constants import *
 
+# Fleet diff settings shared by every issuer
+_FLEET_DIFF = {
+    "comparePatches": [
+        {
+            "apiVersion": "cert-manager.io/v1",
+            "kind": "Issuer",
+            "jsonPointers": [
+                "/metadata/resourceVersion",
+                "/metadata/uid"
+            ]
+        },
+        {
+            "apiVersion": "v1",
+            "kind": "Secret",
+            "jsonPointers": [
+                "/metadata/resourceVersion",
+                "/metadata/uid"
+            ]
+        }
+    ]
+}
+
 
 def create_cert_manager_issuer(
         slug: str,
@@ -158,26 +181,7 @@ def create_cert_manager_issuer(
         "labels": {
             "name": f"{slug}-certificates",
         },
-        "diff": {
-            "comparePatches": [
-                {
-                    "apiVersion": "cert-manager.io/v1",
-                    "kind": "Issuer",
-                    "jsonPointers": [
-                        "/metadata/resourceVersion",
-                        "/metadata/uid"
-                    ]
-                },
-                {
-                    "apiVersion": "v1",
-                    "kind": "Secret",
-                    "jsonPointers": [
-                        "/metadata/resourceVersion",
-                        "/metadata/uid"
-                    ]
-                }
-            ]
-        },
+        "diff": _FLEET_DIFF,
     }
 
     # Write all files
@@ -206,3 +210,26 @@ def create_cert_manager_issuer(
         http_issuer_secret_name=http_issuer_secret_name,
     )
 
+
+def cert_manager_issuer_factory(
+        cloudflare_email: str,
+        cloudflare_api_token: str,
+        ingress_class_name: str,
+) -> Callable[..., IssuerComponent]:
+    """
+    Bind the settings shared by all issuers of an environment.
+
+    Args:
+        cloudflare_email: Email address registered with Cloudflare
+        cloudflare_api_token: Cloudflare API token with DNS edit permissions
+        ingress_class_name: Ingress class used by the HTTP01 solver
+
+    Returns:
+        create_cert_manager_issuer taking only slug, namespace and depends_on
+    """
+    return partial(
+        create_cert_manager_issuer,
+        cloudflare_email=cloudflare_email,
+        cloudflare_api_token=cloudflare_api_token,
+        ingress_class_name=ingress_class_name,
+    )
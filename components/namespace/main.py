@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import yaml
@@ -8,6 +9,26 @@ from ..base.component_types import Component
 from ..base.constants import *
 
 
+@lru_cache(maxsize=None)
+def _render_skaffold(namespace: str) -> str:
+    """Render the skaffold config, which only depends on the namespace."""
+    skaffold_config = {
+        "apiVersion": "skaffold/v3",
+        "kind": "Config",
+        "manifests": {
+            "rawYaml": [
+                "./manifests/namespace.yaml",
+            ],
+        },
+        "deploy": {
+            "kubectl": {
+                "defaultNamespace": namespace,
+            },
+        },
+    }
+    return yaml.dump(skaffold_config, default_flow_style=False)
+
+
 def create_namespace(
     slug: str,
     namespace: str,
@@ -58,23 +79,7 @@ def create_namespace(
           yaml.dump(namespace_manifest, default_flow_style=False))
     
     # Generate skaffold.yaml
-    skaffold_config = {
-        "apiVersion": "skaffold/v3",
-        "kind": "Config",
-        "manifests": {
-            "rawYaml": [
-                "./manifests/namespace.yaml",
-            ],
-        },
-        "deploy": {
-            "kubectl": {
-                "defaultNamespace": namespace,
-            },
-        },
-    }
-    
-    skaffold_yaml = yaml.dump(skaffold_config, default_flow_style=False)
-    write(f"{output_dir}/skaffold-namespace.yaml", skaffold_yaml)
+    write(f"{output_dir}/skaffold-namespace.yaml", _render_skaffold(namespace))
     
     # Generate fleet.yaml for dependencies
     fleet_config = {
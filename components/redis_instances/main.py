@@ -1,12 +1,10 @@
-import os
-from typing import List, Optional, TypedDict, Dict, Any
-import yaml
-
-from ilio import write
+import io
+from collections import ChainMap
+from typing import List, Mapping, Optional, TypedDict, Dict, Any
 
 from components.base.component_types import Component
 from components.base.constants import GENERATED_SKAFFOLD_TMP_DIR
-from components.base.utils import get_chart_path
+from components.base.utils import YamlDumper, ensure_dir, get_chart_path, write_files
 
 
 class RedisInstanceConfig(TypedDict, total=False):
@@ -51,6 +49,75 @@ class RedisInstanceConfig(TypedDict, total=False):
     image_tag: Optional[str]
 
 
+# Values blocks identical for every instance; shared by reference across the
+# generated documents instead of being rebuilt per instance.
+_GLOBAL_SECURITY: Dict[str, Any] = {
+    "security": {
+        "allowInsecureImages": True
+    }
+}
+_METRICS_DEFAULTS: Dict[str, Any] = {
+    "serviceMonitor": {
+        "enabled": False  # Disable by default, can be enabled per environment
+    }
+}
+
+_REDIS_DEFAULTS: Dict[str, Any] = {
+    "auth_enabled": True,
+    "password": None,
+    "architecture": "standalone",
+    "replica_count": 3,
+    "storage_size": "8Gi",
+    "storage_class": None,
+    "resources_requests_memory": "256Mi",
+    "resources_requests_cpu": "250m",
+    "resources_limits_memory": "512Mi",
+    "resources_limits_cpu": "500m",
+    "metrics_enabled": True,
+    "service_type": "ClusterIP",
+    "service_annotations": None,
+    "image_registry": "docker.io",
+    "image_repository": "bitnami/redis",
+    "image_tag": "7.2-debian-12",
+}
+
+
+def _resources_block(cfg: Mapping[str, Any]) -> Dict[str, Any]:
+    """Build the resources requests/limits block for an instance's pods."""
+    return {
+        "requests": {
+            "memory": cfg["resources_requests_memory"],
+            "cpu": cfg["resources_requests_cpu"]
+        },
+        "limits": {
+            "memory": cfg["resources_limits_memory"],
+            "cpu": cfg["resources_limits_cpu"]
+        }
+    }
+
+
+class _YamlWriter:
+    """
+    Render several YAML documents with a single dumper.
+
+    The dumper stream stays open between documents; the emitter prefixes
+    every document after the first with a '---' marker, which is stripped
+    so each returned string is a standalone file.
+    """
+
+    def __init__(self):
+        self.buf = io.StringIO()
+        self.dumper = YamlDumper(self.buf, default_flow_style=False, sort_keys=False)
+        self.dumper.open()
+
+    def dump(self, obj: Any) -> str:
+        self.dumper.represent(obj)
+        text = self.buf.getvalue()
+        self.buf.seek(0)
+        self.buf.truncate()
+        return text.removeprefix("---\n")
+
+
 def create_redis_instances(
     slug: str,
     namespace: str,
@@ -72,106 +139,84 @@ def create_redis_instances(
     # Create directory structure
     dir_name = f"{slug}-redis-instances"
     output_dir = f'{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}'
-    os.makedirs(output_dir, exist_ok=True)
+    ensure_dir(output_dir)
+    yaml_writer = _YamlWriter()
     
     # Create Helm releases for each Redis instance
     helm_releases = []
     redis_instances_info = []
+    instances_values = []
+    redis_chart_path = get_chart_path("./charts/redis")
     
     for instance_config in instances:
-        instance_slug = instance_config["slug"]
+        cfg = ChainMap(instance_config, _REDIS_DEFAULTS)
+        instance_slug = cfg["slug"]
+        architecture = cfg["architecture"]
+        is_replication = architecture == "replication"
+        
+        # Master and replica pods share the same resources and service settings
+        resources = _resources_block(cfg)
+        service = {
+            "type": cfg["service_type"],
+        }
+        if cfg["service_annotations"]:
+            service["annotations"] = cfg["service_annotations"]
         
         # Prepare Helm values for this instance
         helm_values = {
             "fullnameOverride": instance_slug,
-            "global": {
-                "security": {
-                    "allowInsecureImages": True
-                }
-            },
+            "global": _GLOBAL_SECURITY,
             "image": {
-                "registry": instance_config.get("image_registry", "docker.io"),
-                "repository": instance_config.get("image_repository", "bitnami/redis"),
-                "tag": instance_config.get("image_tag", "7.2-debian-12")
+                "registry": cfg["image_registry"],
+                "repository": cfg["image_repository"],
+                "tag": cfg["image_tag"]
             },
             "auth": {
-                "enabled": instance_config.get("auth_enabled", True),
+                "enabled": cfg["auth_enabled"],
             },
-            "architecture": instance_config.get("architecture", "standalone"),
+            "architecture": architecture,
             "master": {
                 "persistence": {
                     "enabled": True,
-                    "size": instance_config.get("storage_size", "8Gi"),
+                    "size": cfg["storage_size"],
                 },
-                "resources": {
-                    "requests": {
-                        "memory": instance_config.get("resources_requests_memory", "256Mi"),
-                        "cpu": instance_config.get("resources_requests_cpu", "250m")
-                    },
-                    "limits": {
-                        "memory": instance_config.get("resources_limits_memory", "512Mi"),
-                        "cpu": instance_config.get("resources_limits_cpu", "500m")
-                    }
-                },
-                "service": {
-                    "type": instance_config.get("service_type", "ClusterIP"),
-                }
+                "resources": resources,
+                "service": service,
             },
             "metrics": {
-                "enabled": instance_config.get("metrics_enabled", True),
-                "serviceMonitor": {
-                    "enabled": False  # Disable by default, can be enabled per environment
-                }
+                "enabled": cfg["metrics_enabled"],
+                "serviceMonitor": _METRICS_DEFAULTS["serviceMonitor"],
             }
         }
         
         # Add password if provided
-        if instance_config.get("password"):
-            helm_values["auth"]["password"] = instance_config["password"]
+        if cfg["password"]:
+            helm_values["auth"]["password"] = cfg["password"]
         
         # Add storage class if provided
-        if instance_config.get("storage_class"):
-            helm_values["master"]["persistence"]["storageClass"] = instance_config["storage_class"]
-        
-        # Add service annotations if provided
-        if instance_config.get("service_annotations"):
-            helm_values["master"]["service"]["annotations"] = instance_config["service_annotations"]
+        if cfg["storage_class"]:
+            helm_values["master"]["persistence"]["storageClass"] = cfg["storage_class"]
         
         # Configure replica settings for replication architecture
-        if instance_config.get("architecture") == "replication":
+        if is_replication:
             helm_values["replica"] = {
-                "replicaCount": instance_config.get("replica_count", 3),
+                "replicaCount": cfg["replica_count"],
                 "persistence": {
                     "enabled": True,
-                    "size": instance_config.get("storage_size", "8Gi"),
-                },
-                "resources": {
-                    "requests": {
-                        "memory": instance_config.get("resources_requests_memory", "256Mi"),
-                        "cpu": instance_config.get("resources_requests_cpu", "250m")
-                    },
-                    "limits": {
-                        "memory": instance_config.get("resources_limits_memory", "512Mi"),
-                        "cpu": instance_config.get("resources_limits_cpu", "500m")
-                    }
+                    "size": cfg["storage_size"],
                 },
-                "service": {
-                    "type": instance_config.get("service_type", "ClusterIP"),
-                }
+                "resources": resources,
+                "service": service,
             }
             
             # Add storage class for replicas if provided
-            if instance_config.get("storage_class"):
-                helm_values["replica"]["persistence"]["storageClass"] = instance_config["storage_class"]
-            
-            # Add service annotations for replicas if provided
-            if instance_config.get("service_annotations"):
-                helm_values["replica"]["service"]["annotations"] = instance_config["service_annotations"]
+            if cfg["storage_class"]:
+                helm_values["replica"]["persistence"]["storageClass"] = cfg["storage_class"]
         
         # Add to Helm releases
         helm_releases.append({
             "name": f"{instance_slug}-redis",
-            "chartPath": get_chart_path("./charts/redis"),
+            "chartPath": redis_chart_path,
             "valuesFiles": [f"./values-{instance_slug}.yaml"],
             "namespace": namespace,
             "createNamespace": True,
@@ -179,23 +224,28 @@ def create_redis_instances(
             "upgradeOnChange": True
         })
         
-        # Write values file for this instance
-        with open(f"{output_dir}/values-{instance_slug}.yaml", "w") as file:
-            yaml.dump(helm_values, file, default_flow_style=False)
+        instances_values.append((instance_slug, helm_values))
         
         # Store instance information
-        redis_host = f"{instance_slug}-master" if instance_config.get("architecture") == "standalone" else f"{instance_slug}-master"
+        redis_host = f"{instance_slug}-master"
         redis_port = 6379
         
         redis_instances_info.append({
             "slug": instance_slug,
             "host": redis_host,
             "port": redis_port,
-            "architecture": instance_config.get("architecture", "standalone"),
-            "auth_enabled": instance_config.get("auth_enabled", True),
-            "password_secret": f"{instance_slug}-redis" if instance_config.get("auth_enabled", True) else None
+            "architecture": architecture,
+            "auth_enabled": cfg["auth_enabled"],
+            "password_secret": f"{instance_slug}-redis" if cfg["auth_enabled"] else None
         })
     
+    # Render the values files in one pass. Each release keeps its own file:
+    # Helm only reads the first document of a multi-document values file.
+    files = [
+        (f"{output_dir}/values-{instance_slug}.yaml", yaml_writer.dump(helm_values))
+        for instance_slug, helm_values in instances_values
+    ]
+    
     # Generate skaffold.yaml
     skaffold_config = {
         "apiVersion": "skaffold/v3",
@@ -212,8 +262,8 @@ def create_redis_instances(
         },
     }
     
-    skaffold_yaml = yaml.dump(skaffold_config, default_flow_style=False)
-    write(f"{output_dir}/skaffold-redis-instances.yaml", skaffold_yaml)
+    skaffold_yaml = yaml_writer.dump(skaffold_config)
+    files.append((f"{output_dir}/skaffold-redis-instances.yaml", skaffold_yaml))
     
     # Generate fleet.yaml for dependencies
     fleet_config = {
@@ -228,16 +278,19 @@ def create_redis_instances(
         }
     }
     
-    fleet_yaml = yaml.dump(fleet_config, default_flow_style=False)
-    write(f"{output_dir}/fleet.yaml", fleet_yaml)
+    fleet_yaml = yaml_writer.dump(fleet_config)
+    files.append((f"{output_dir}/fleet.yaml", fleet_yaml))
     
     # Create a summary file with instance details
     instances_summary = {
         "redis_instances": redis_instances_info
     }
     
-    with open(f"{output_dir}/instances-summary.yaml", "w") as file:
-        yaml.dump(instances_summary, file, default_flow_style=False)
+    files.append((f"{output_dir}/instances-summary.yaml",
+                  yaml_writer.dump(instances_summary)))
+    
+    # Write all generated files
+    write_files(files)
     
     # Return Component object
     return Component(
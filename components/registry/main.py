@@ -1,13 +1,18 @@
-import base64
-import json
-import os
-from typing import List, Optional
-
-from ilio import write
+from typing import List, Optional, Union
 
 from .component_types import RegistryComponent
 from ..base.component_types import Component
 from ..base.constants import *
+from ..base.utils import dump_json, dump_yaml, ensure_dir, write_files
+
+
+def _b64(value: Union[str, bytes]) -> str:
+    """Base64-encode a secret value for a Kubernetes Secret ``data`` field."""
+    import base64
+
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return base64.b64encode(value).decode("ascii")
 
 
 def create_registry(
@@ -41,11 +46,11 @@ def create_registry(
     secret_name = f"{slug}-registry-secret"
     kaniko_secret_name = f"{slug}-registry-kaniko-secret"
 
-    os.makedirs(output_dir, exist_ok=True)
-    os.makedirs(manifests_dir, exist_ok=True)
+    ensure_dir(output_dir)
+    ensure_dir(manifests_dir)
 
     # Extract registry domain from URL
-    registry_domain = registry_url.split("/")[0]
+    registry_domain, _, _ = registry_url.partition("/")
 
     # Create registry secret
     docker_config = {
@@ -61,6 +66,10 @@ def create_registry(
     if insecure_registries:
         docker_config["insecure-registries"] = insecure_registries
 
+    # Serialize the docker config once; both secrets carry the same payload
+    docker_config_bytes = dump_json(docker_config)
+    docker_config_b64 = _b64(docker_config_bytes)
+
     # Create secret manifest
     # TODO: the below secret is not sealed correctly
     registry_secret = {
@@ -71,7 +80,7 @@ def create_registry(
             "namespace": namespace
         },
         "data": {
-            ".dockerconfigjson": base64.b64encode(json.dumps(docker_config).encode()).decode()
+            ".dockerconfigjson": docker_config_b64
         },
         "type": "kubernetes.io/dockerconfigjson"
     }
@@ -86,19 +95,21 @@ def create_registry(
             "namespace": namespace
         },
         "data": {
-            "registry_url": base64.b64encode(registry_url.encode()).decode(),
-            "registry_username": base64.b64encode(registry_username.encode()).decode(),
-            "registry_password": base64.b64encode(registry_password.encode()).decode(),
-            "config.json": base64.b64encode(json.dumps(docker_config).encode()).decode()
+            "registry_url": _b64(registry_url),
+            "registry_username": _b64(registry_username),
+            "registry_password": _b64(registry_password),
+            "config.json": docker_config_b64
         },
         "type": "Opaque"
     }
 
-    # Write registry secret manifests
-    write(f"{manifests_dir}/registry-secret.yaml",
-          yaml.dump(registry_secret, default_flow_style=False))
-    write(f"{manifests_dir}/registry-kaniko-secret.yaml",
-          yaml.dump(kaniko_registry_secret, default_flow_style=False))
+    # Registry secret manifests
+    files = [
+        (f"{manifests_dir}/registry-secret.yaml",
+         dump_yaml(registry_secret)),
+        (f"{manifests_dir}/registry-kaniko-secret.yaml",
+         dump_yaml(kaniko_registry_secret)),
+    ]
 
     # Generate skaffold.yaml
     skaffold_config = {
@@ -117,8 +128,8 @@ def create_registry(
         },
     }
 
-    skaffold_yaml = yaml.dump(skaffold_config, default_flow_style=False)
-    write(f"{output_dir}/skaffold-registry.yaml", skaffold_yaml)
+    skaffold_yaml = dump_yaml(skaffold_config)
+    files.append((f"{output_dir}/skaffold-registry.yaml", skaffold_yaml))
 
     # Generate fleet.yaml for dependencies
     fleet_config = {
@@ -133,8 +144,11 @@ def create_registry(
         }
     }
 
-    fleet_yaml = yaml.dump(fleet_config, default_flow_style=False)
-    write(f"{output_dir}/fleet.yaml", fleet_yaml)
+    fleet_yaml = dump_yaml(fleet_config)
+    files.append((f"{output_dir}/fleet.yaml", fleet_yaml))
+
+    # Write all generated files
+    write_files(files)
 
     return RegistryComponent(
         slug=slug,
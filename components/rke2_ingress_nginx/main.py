@@ -6,10 +6,55 @@ which handles ingress traffic routing in Kubernetes using a HelmChartConfig.
 """
 from typing import Dict, List, Optional, Any
 
-from ilio import write
-
 from ..base.component_types import Component
 from ..base.constants import *
+from ..base.utils import YamlDumper, ensure_dir, write_files
+
+
+class _LiteralStr(str):
+    """String emitted as a YAML literal block scalar (``|``)."""
+
+
+class _Dumper(YamlDumper):
+    pass
+
+
+def _represent_literal_str(dumper: yaml.SafeDumper, data: _LiteralStr) -> yaml.ScalarNode:
+    # libyaml's emitter only accepts exact str instances
+    return dumper.represent_scalar("tag:yaml.org,2002:str", str(data), style="|")
+
+
+_Dumper.add_representer(_LiteralStr, _represent_literal_str)
+
+
+_DEFAULT_BACKEND_VALUES: Dict[str, Any] = {
+    "enabled": True,
+    "resources": {
+        "requests": {
+            "cpu": "10m",
+            "memory": "20Mi"
+        },
+        "limits": {
+            "cpu": "50m",
+            "memory": "50Mi"
+        }
+    }
+}
+
+
+def _deep_merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge overrides into base recursively without modifying either input.
+
+    Nested dicts are merged key by key; any other override value replaces the base value.
+    """
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
 
 
 def create_rke2_ingress_nginx(
@@ -43,7 +88,7 @@ def create_rke2_ingress_nginx(
     # Create directory structure
     dir_name = f"{slug}-ingress-nginx"
     output_dir = f'{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}'
-    os.makedirs(output_dir, exist_ok=True)
+    ensure_dir(output_dir)
     
     # Default resources if not provided
     if resources is None:
@@ -83,11 +128,10 @@ def create_rke2_ingress_nginx(
     }
     
     # Merge with extra values if provided
-    if extra_values:
-        # Deep merge would be better, but this is a simple approach
-        if "controller" in extra_values:
-            for k, v in extra_values["controller"].items():
-                controller_values[k] = v
+    values = _deep_merge({
+        "controller": controller_values,
+        "defaultBackend": _DEFAULT_BACKEND_VALUES,
+    }, extra_values or {})
     
     # Create the HelmChartConfig manifest
     helm_chart_config = {
@@ -98,30 +142,12 @@ def create_rke2_ingress_nginx(
             "namespace": namespace
         },
         "spec": {
-            "valuesContent": yaml.dump({
-                "controller": controller_values,
-                "defaultBackend": {
-                    "enabled": True,
-                    "resources": {
-                        "requests": {
-                            "cpu": "10m",
-                            "memory": "20Mi"
-                        },
-                        "limits": {
-                            "cpu": "50m",
-                            "memory": "50Mi"
-                        }
-                    }
-                },
-                **(extra_values or {})
-            }, default_flow_style=False)
+            "valuesContent": _LiteralStr(
+                yaml.dump(values, Dumper=_Dumper, default_flow_style=False, sort_keys=False)
+            )
         }
     }
     
-    # Write the manifest to a file
-    with open(f"{output_dir}/ingress-nginx-helmchartconfig.yaml", "w") as file:
-        yaml.dump(helm_chart_config, file, default_flow_style=False)
-    
     # Generate Skaffold configuration
     skaffold_config = {
         "apiVersion": "skaffold/v3",
@@ -149,11 +175,14 @@ def create_rke2_ingress_nginx(
     }
 
     # Write configuration files
-    write(f"{output_dir}/skaffold-ingress-nginx.yaml", 
-          yaml.dump(skaffold_config, default_flow_style=False))
-    
-    write(f"{output_dir}/fleet.yaml", 
-          yaml.dump(fleet_config, default_flow_style=False))
+    write_files([
+        (f"{output_dir}/ingress-nginx-helmchartconfig.yaml",
+         yaml.dump(helm_chart_config, Dumper=_Dumper, default_flow_style=False, sort_keys=False)),
+        (f"{output_dir}/skaffold-ingress-nginx.yaml",
+         yaml.dump(skaffold_config, Dumper=_Dumper, default_flow_style=False, sort_keys=False)),
+        (f"{output_dir}/fleet.yaml",
+         yaml.dump(fleet_config, Dumper=_Dumper, default_flow_style=False, sort_keys=False)),
+    ])
 
     return Component(
         slug=slug,
@@ -1,13 +1,36 @@
-import os
 from typing import Dict, List, Optional, Any, TypedDict
-import yaml
-import base64
-
-from ilio import write
+import json
 
 from components.base.component_types import Component
 from components.base.constants import GENERATED_SKAFFOLD_TMP_DIR
-from components.base.utils import get_chart_path
+from components.base.utils import dump_json, dump_yaml, ensure_dir, get_chart_path, write_files
+
+# Resolved once at import; the chart location never changes between calls
+_CHART_PATH = get_chart_path("./charts/whatsapp-waha")
+
+# Values blocks that are the same for every deployment
+_SERVICE_VALUES: Dict[str, Any] = {
+    "type": "ClusterIP",
+    "port": 80,
+    "targetPort": 3000
+}
+_INGRESS_ROOT_PATHS: List[Dict[str, str]] = [
+    {
+        "path": "/",
+        "pathType": "Prefix"
+    }
+]
+
+# S3StorageConfig key -> WAHA environment variable, with an optional value conversion
+_S3_FIELD_MAP = (
+    ("region", "WAHA_S3_REGION", None),
+    ("bucket", "WAHA_S3_BUCKET", None),
+    ("access_key_id", "WAHA_S3_ACCESS_KEY_ID", None),
+    ("secret_access_key", "WAHA_S3_SECRET_ACCESS_KEY", None),
+    ("endpoint", "WAHA_S3_ENDPOINT", None),
+    ("force_path_style", "WAHA_S3_FORCE_PATH_STYLE", str),
+    ("proxy_files", "WAHA_S3_PROXY_FILES", str),
+)
 
 
 class S3StorageConfig(TypedDict, total=False):
@@ -32,6 +55,126 @@ class S3StorageConfig(TypedDict, total=False):
     proxy_files: Optional[bool]
 
 
+# The skaffold config has a fixed shape, so it is rendered from a template.
+# Scalars are substituted as JSON strings, which are valid double-quoted YAML
+# scalars.
+_SKAFFOLD_TEMPLATE = """\
+apiVersion: skaffold/v3
+kind: Config
+manifests:
+  helm:
+    releases:
+    - name: {release_name}
+      chartPath: {chart_path}
+      valuesFiles:
+      - ./values.yaml
+      namespace: {namespace}
+      createNamespace: true
+      wait: true
+      upgradeOnChange: true{raw_yaml}
+deploy:
+  kubectl:
+    defaultNamespace: {namespace}
+"""
+# Only referenced when the basic-auth secret is actually generated
+_SKAFFOLD_BASIC_AUTH_RAW_YAML = """
+  rawYaml:
+  - ./manifests/basic-auth-secret.yaml"""
+
+
+def _helm_values(
+    slug: str,
+    image_repository: str,
+    image_tag: str,
+    replicas: int,
+    env_vars: Dict[str, str],
+    ingress_enabled: bool,
+    ingress_class_name: str,
+    basic_auth_enabled: bool,
+    basic_auth_realm: str
+) -> Dict[str, Any]:
+    """
+    Build the Helm values shared by every WAHA deployment, without ingress hosts or TLS.
+    """
+    return {
+        "nameOverride": slug,
+        "replicaCount": replicas,
+        "image": {
+            "repository": image_repository,
+            "tag": image_tag
+        },
+        "service": _SERVICE_VALUES,
+        "env": env_vars,
+        "ingress": {
+            "enabled": ingress_enabled,
+            "className": ingress_class_name
+        },
+        "basicAuth": {
+            "enabled": basic_auth_enabled,
+            "secretName": f"{slug}-basic-auth",
+            "realm": basic_auth_realm
+        }
+    }
+
+
+def _fleet_config(dir_name: str, depends_on: Optional[List[Component]]) -> Dict[str, Any]:
+    """
+    Build the fleet.yaml content for a WAHA deployment.
+    """
+    return {
+        "dependsOn": [
+            c.as_fleet_dependency for c in depends_on
+        ] if depends_on else [],
+        "helm": {
+            "releaseName": dir_name,
+        },
+        "labels": {
+            "name": dir_name
+        }
+    }
+
+
+def _create_minimal_waha(
+    slug: str,
+    namespace: str,
+    image_repository: str,
+    image_tag: str,
+    replicas: int,
+    ingress_class_name: str,
+    basic_auth_realm: str,
+    depends_on: Optional[List[Component]]
+) -> Component:
+    """
+    Fast path of create_whatsapp_waha for deployments without ingress, basic
+    auth, Postgres, S3 or extra environment variables.
+    """
+    dir_name = f"{slug}-whatsapp-waha"
+    output_dir = f'{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}'
+    ensure_dir(output_dir)
+
+    write_files([
+        (f"{output_dir}/values.yaml", dump_json(_helm_values(
+            slug, image_repository, image_tag, replicas, {},
+            False, ingress_class_name, False, basic_auth_realm
+        ), indent=True)),
+        (f"{output_dir}/skaffold-whatsapp-waha.yaml", _SKAFFOLD_TEMPLATE.format(
+            release_name=json.dumps(dir_name),
+            chart_path=json.dumps(_CHART_PATH),
+            namespace=json.dumps(namespace),
+            raw_yaml="",
+        )),
+        (f"{output_dir}/fleet.yaml", dump_yaml(_fleet_config(dir_name, depends_on))),
+    ])
+
+    return Component(
+        slug=slug,
+        namespace=namespace,
+        dir_name=dir_name,
+        fleet_name=dir_name,
+        depends_on=depends_on
+    )
+
+
 def create_whatsapp_waha(
     slug: str,
     namespace: str,
@@ -76,12 +219,23 @@ def create_whatsapp_waha(
     Returns:
         Component object with metadata about the deployment
     """
+    if not (ingress_enabled or basic_auth_enabled or postgres_uri or s3_storage or env_vars):
+        return _create_minimal_waha(
+            slug, namespace, image_repository, image_tag, replicas,
+            ingress_class_name, basic_auth_realm, depends_on
+        )
+
     # Create directory structure
     dir_name = f"{slug}-whatsapp-waha"
     output_dir = f'{GENERATED_SKAFFOLD_TMP_DIR}/{dir_name}'
-    os.makedirs(output_dir, exist_ok=True)
     manifests_dir = f"{output_dir}/manifests"
-    os.makedirs(manifests_dir, exist_ok=True)
+    # The manifests dir only holds the basic-auth secret
+    ensure_dir(manifests_dir if basic_auth_enabled else output_dir)
+    values_path = f"{output_dir}/values.yaml"
+    skaffold_path = f"{output_dir}/skaffold-whatsapp-waha.yaml"
+    fleet_path = f"{output_dir}/fleet.yaml"
+    secret_path = f"{manifests_dir}/basic-auth-secret.yaml"
+    files = []
     
     # Validate basic auth parameters
     if basic_auth_enabled:
@@ -101,64 +255,24 @@ def create_whatsapp_waha(
     # Add S3 storage configuration if provided
     if s3_storage:
         environment_vars["WAHA_MEDIA_STORAGE"] = "S3"
-        
-        if "region" in s3_storage:
-            environment_vars["WAHA_S3_REGION"] = s3_storage["region"]
-        
-        if "bucket" in s3_storage:
-            environment_vars["WAHA_S3_BUCKET"] = s3_storage["bucket"]
-        
-        if "access_key_id" in s3_storage:
-            environment_vars["WAHA_S3_ACCESS_KEY_ID"] = s3_storage["access_key_id"]
-        
-        if "secret_access_key" in s3_storage:
-            environment_vars["WAHA_S3_SECRET_ACCESS_KEY"] = s3_storage["secret_access_key"]
-        
-        if "endpoint" in s3_storage:
-            environment_vars["WAHA_S3_ENDPOINT"] = s3_storage["endpoint"]
-        
-        if "force_path_style" in s3_storage:
-            environment_vars["WAHA_S3_FORCE_PATH_STYLE"] = str(s3_storage["force_path_style"])
-        
-        if "proxy_files" in s3_storage:
-            environment_vars["WAHA_S3_PROXY_FILES"] = str(s3_storage["proxy_files"])
+        environment_vars.update({
+            env_name: convert(s3_storage[key]) if convert else s3_storage[key]
+            for key, env_name, convert in _S3_FIELD_MAP
+            if key in s3_storage
+        })
     
     # Generate Helm values
-    helm_values = {
-        "nameOverride": slug,
-        "replicaCount": replicas,
-        "image": {
-            "repository": image_repository,
-            "tag": image_tag
-        },
-        "service": {
-            "type": "ClusterIP",
-            "port": 80,
-            "targetPort": 3000
-        },
-        "env": environment_vars,
-        "ingress": {
-            "enabled": ingress_enabled,
-            "className": ingress_class_name
-        },
-        "basicAuth": {
-            "enabled": basic_auth_enabled,
-            "secretName": basic_auth_secret,
-            "realm": basic_auth_realm
-        }
-    }
+    helm_values = _helm_values(
+        slug, image_repository, image_tag, replicas, environment_vars,
+        ingress_enabled, ingress_class_name, basic_auth_enabled, basic_auth_realm
+    )
     
     # Configure ingress if enabled
     if ingress_enabled and ingress_host:
         helm_values["ingress"]["hosts"] = [
             {
                 "host": ingress_host,
-                "paths": [
-                    {
-                        "path": "/",
-                        "pathType": "Prefix"
-                    }
-                ]
+                "paths": _INGRESS_ROOT_PATHS
             }
         ]
         
@@ -171,16 +285,18 @@ def create_whatsapp_waha(
                 }
             ]
     
-    # Write values file
-    with open(f"{output_dir}/values.yaml", "w") as file:
-        yaml.dump(helm_values, file, default_flow_style=False)
+    # Write values file; JSON is valid YAML, so Helm reads it unchanged
+    files.append((values_path, dump_json(helm_values, indent=True)))
     
 
     # Create basic auth secret if enabled
     if basic_auth_enabled and username and password:
+        # Only needed for basic auth, so imported here rather than at module load
+        import binascii
+
         # Create htpasswd-like string: username:hashed_password
         auth_string = f"{username}:{password}"
-        auth_base64 = base64.b64encode(auth_string.encode()).decode()
+        auth_base64 = binascii.b2a_base64(auth_string.encode("utf-8"), newline=False).decode("ascii")
         
         # Create secret manifest
         basic_auth_manifest = {
@@ -197,64 +313,27 @@ def create_whatsapp_waha(
         }
         
         # Write secret manifest
-        with open(f"{manifests_dir}/basic-auth-secret.yaml", "w") as file:
-            yaml.dump(basic_auth_manifest, file, default_flow_style=False)
+        files.append((secret_path, dump_json(basic_auth_manifest, indent=True)))
 
     # Generate skaffold.yaml
-    skaffold_config = {
-        "apiVersion": "skaffold/v3",
-        "kind": "Config",
-        "manifests": {
-            "helm": {
-                "releases": [
-                    {
-                        "name": f"{slug}-whatsapp-waha",
-                        "chartPath": get_chart_path("./charts/whatsapp-waha"),
-                        "valuesFiles": [
-                            f"./values.yaml"
-                        ],
-                        "namespace": namespace,
-                        "createNamespace": True,
-                        "wait": True,
-                        "upgradeOnChange": True
-                    }
-                ],
-            },
-            "rawYaml": [
-                f"./manifests/basic-auth-secret.yaml",
-            ],
-        },
-        "deploy": {
-            "kubectl": {
-                "defaultNamespace": namespace,
-            },
-        },
-    }
-
-    skaffold_yaml = yaml.dump(skaffold_config, default_flow_style=False)
-    write(f"{output_dir}/skaffold-whatsapp-waha.yaml", skaffold_yaml)
+    files.append((skaffold_path, _SKAFFOLD_TEMPLATE.format(
+        release_name=json.dumps(dir_name),
+        chart_path=json.dumps(_CHART_PATH),
+        namespace=json.dumps(namespace),
+        raw_yaml=_SKAFFOLD_BASIC_AUTH_RAW_YAML if basic_auth_enabled else "",
+    )))
 
     # Generate fleet.yaml for dependencies
-    fleet_config = {
-        "dependsOn": [
-            c.as_fleet_dependency for c in depends_on
-        ] if depends_on else [],
-        "helm": {
-            "releaseName": f"{slug}-whatsapp-waha",
-        },
-        "labels": {
-            "name": f"{slug}-whatsapp-waha"
-        }
-    }
+    files.append((fleet_path, dump_yaml(_fleet_config(dir_name, depends_on))))
 
-    fleet_yaml = yaml.dump(fleet_config, default_flow_style=False)
-    write(f"{output_dir}/fleet.yaml", fleet_yaml)
+    # Write all generated files
+    write_files(files)
 
     # Return Component object
     return Component(
         slug=slug,
         namespace=namespace,
         dir_name=dir_name,
-        fleet_name=f"{slug}-whatsapp-waha",
+        fleet_name=dir_name,
         depends_on=depends_on
     )
@@ -1,67 +1,120 @@
 import os
-import shutil
-import subprocess
 import sys
-import yaml
-import json
-import pprint
-from components.whatsapp_waha.main import create_whatsapp_waha
-from components.postgresql_operator.main import create_postgresql_operator_crds, create_postgresql_operator
-from components.postgresql_instance.main import create_postgres_instance as create_postgres_instance_base
+from itertools import chain
+from pathlib import Path
 
 # Set config path before imports
-current_dir = os.path.dirname(os.path.abspath(__file__))
-config_path = os.path.join(current_dir, 'secrets/config_env.yaml')
+current_file = Path(__file__).resolve()
+config_path = str(current_file.parent / 'secrets' / 'config_env.yaml')
 os.environ['CONFIG_YAML_PATH'] = config_path
 
 # Add the repository root to the Python path to enable absolute imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, project_root)
+sys.path.insert(0, str(current_file.parents[2]))
 
 # Use absolute imports
-from components.base.constants import (
-    GENERATED_SKAFFOLD_TMP_DIR,
-    GENERATED_SKAFFOLD_DIR,
-    INTELLIJ_RUN_CONFIGURATIONS_ENABLED,
-    CONFIG
+from components.base.constants import CONFIG
+from components.base.generate_skaffolds import generate_environment
+
+
+# Static component settings, shared across runs; the factories only read them
+_METALLB_ADDRESS_POOLS = (
+    {
+        "name": "default",
+        "protocol": "layer2",
+        "addresses": ["10.3.0.100-10.3.255.254"]  # Adjust this range to your network
+    },
+)
+
+# Storage classes for different performance tiers
+_LONGHORN_STORAGE_CLASSES = (
+    {
+        "name": "longhorn-nvme",
+        "replica_count": 2,
+        "disk_selector": ["nvme"],
+        "is_default": True,
+        "reclaim_policy": "Retain",
+        "fs_type": "ext4"
+    },
+    {
+        "name": "longhorn-ssd",
+        "replica_count": 3,
+        "disk_selector": ["ssd"],
+        "is_default": False,
+        "reclaim_policy": "Retain",
+        "fs_type": "ext4"
+    },
+    {
+        "name": "longhorn-hdd",
+        "replica_count": 1,
+        "disk_selector": ["hdd"],
+        "is_default": False,
+        "reclaim_policy": "Retain",
+        "fs_type": "ext4"
+    },
 )
-from components.base.generate_skaffolds import generate_skaffolds
-from components.cert_manager_operator.main import create_cert_manager_operator
-from components.namespace.main import create_namespace
-from components.cert_manager_issuer.main import create_cert_manager_issuer
-from components.cert_manager_certificate.main import create_cert_manager_certificate
-from components.rancher.main import create_rancher
-from components.rke2_ingress_nginx.main import create_ingress_nginx
-from components.longhorn.main import create_longhorn
-from components.increase_fs_watchers_limit.main import create_increase_fs_watchers_limit
-from components.intellij_skaffolds_run_configurations.main import generate_intelij_skaffolds_run_configurations
-from components.metallb.main import create_metallb
-from components.cloudflare_tunnel.main import create_cloudflare_tunnel
+
+# Optional WhatsApp WAHA database settings, with the values used when the config omits them
+_POSTGRES_DEFAULTS = {
+    "replicas": 1,
+    "storage_size": "5Gi",
+    "wal_storage_size": "1Gi",
+    "repo_storage_size": "2Gi",
+    "s3_backup": None,
+    "s3_bootstrap": None,
+    "service_type": "LoadBalancer",
+    "service_annotations": {},
+}
+
+
+def _root_domain(fqdn: str) -> str:
+    """Strip the first label of a domain name (e.g. 'a.example.com' -> 'example.com')."""
+    return fqdn.partition('.')[2]
+
+
+def _component_enabled(config, name: str) -> bool:
+    """Components are enabled unless their config sets `enabled: false`."""
+    return config['components'].get(name, {}).get('enabled', True)
 
 
 # ===== MAIN GENERATION FUNCTION =====
 
 def generate_all_skaffolds():
     """Generate all configurations for the production environment"""
-    # Clean up and create temporary directory
-    shutil.rmtree(f"{GENERATED_SKAFFOLD_TMP_DIR}", ignore_errors=True)
-    os.makedirs(f'{GENERATED_SKAFFOLD_TMP_DIR}', exist_ok=True)
-
-    # Create an empty .gitkeep file
-    with open(f'{GENERATED_SKAFFOLD_TMP_DIR}/.gitkeep', 'w') as f:
-        f.write("")
-
-    # Load secrets
-    # Load configuration from YAML
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    generate_environment(CONFIG, _create_components)
+
+
+def _create_components(config):
+    """Create the components of this environment, returning them in deployment order"""
+    # Component modules are only imported once generation actually runs
+    from components.cert_manager_certificate.main import create_cert_manager_certificate
+    from components.cert_manager_issuer.main import cert_manager_issuer_factory
+    from components.cert_manager_operator.main import create_cert_manager_operator
+    from components.cloudflare_tunnel.main import create_cloudflare_tunnel
+    from components.increase_fs_watchers_limit.main import create_increase_fs_watchers_limit
+    from components.ingress_nginx.main import create_ingress_nginx
+    from components.longhorn.main import create_longhorn
+    from components.metallb.main import create_metallb
+    from components.namespace.main import create_namespace
+    from components.postgresql_instance.main import create_postgres_instance as create_postgres_instance_base
+    from components.postgresql_operator.main import create_postgresql_operator, create_postgresql_operator_crds
+    from components.rancher.main import create_rancher
+    from components.whatsapp_waha.main import create_whatsapp_waha
+
     env_vars = config.get('env', {})
 
+    # All issuers share the Cloudflare credentials and the ingress class
+    create_cert_manager_issuer = cert_manager_issuer_factory(
+        cloudflare_email=env_vars['CLOUDFLARE_EMAIL'],
+        cloudflare_api_token=env_vars['CLOUDFLARE_API_TOKEN'],
+        ingress_class_name="nginx",
+    )
+
     # Core infrastructure
     increase_fs_watchers_limit = create_increase_fs_watchers_limit(
         slug="increase-fs-watchers-limit",
         namespace="kube-system"
     )
+    core_stack = (increase_fs_watchers_limit,)
 
     # Cert-manager
     cert_manager_namespace = create_namespace(
@@ -76,6 +129,7 @@ def generate_all_skaffolds():
             cert_manager_namespace,
         ]
     )
+    cert_manager_stack = (cert_manager_namespace, cert_manager_operator)
 
     # Platform services
     # MetalLB
@@ -87,17 +141,13 @@ def generate_all_skaffolds():
     metallb = create_metallb(
         slug="metallb",
         namespace="metallb-system",
-        address_pools=[
-            {
-                "name": "default",
-                "protocol": "layer2",
-                "addresses": ["10.3.0.100-10.3.255.254"]  # Adjust this range to your network
-            }
-        ],
+        address_pools=_METALLB_ADDRESS_POOLS,
         depends_on=[
             metallb_namespace,
         ]
     )
+    metallb_stack = (metallb_namespace, metallb)
+
     # Ingress Nginx
     ingress_nginx_namespace = create_namespace(
         slug="ingress-nginx",
@@ -113,257 +163,246 @@ def generate_all_skaffolds():
             metallb,
         ]
     )
+    ingress_nginx_stack = (ingress_nginx_namespace, ingress_nginx)
 
     # Longhorn
-    longhorn_config = config['components']['longhorn']
-    longhorn_namespace = create_namespace(
-        slug="longhorn",
-        namespace="longhorn-system",
-        depends_on=[]
-    )
-    longhorn_cert_manager_issuer = create_cert_manager_issuer(
-        slug="longhorn",
-        namespace="longhorn-system",
-        cloudflare_email=env_vars['CLOUDFLARE_EMAIL'],
-        cloudflare_api_token=env_vars['CLOUDFLARE_API_TOKEN'],
-        depends_on=[
-            longhorn_namespace,
-            cert_manager_operator
-        ]
-    )
-
-    longhorn_root_domain = '.'.join(longhorn_config['LONGHORN_DOMAIN_NAME'].split('.')[1:])
-    longhorn_cert_manager_certificate = create_cert_manager_certificate(
-        slug="longhorn",
-        namespace="longhorn-system",
-        domain_name=longhorn_root_domain,
-        issuer_secret_name=longhorn_cert_manager_issuer.issuer_secret_name,
-        certificate_dns_names=[
-            longhorn_root_domain,
-            f"*.{longhorn_root_domain}",
-        ],
-        depends_on=[
+    longhorn_stack = ()
+    if _component_enabled(config, 'longhorn'):
+        longhorn_config = config['components']['longhorn']
+        longhorn_namespace = create_namespace(
+            slug="longhorn",
+            namespace="longhorn-system",
+            depends_on=[]
+        )
+        longhorn_cert_manager_issuer = create_cert_manager_issuer(
+            slug="longhorn",
+            namespace="longhorn-system",
+            depends_on=[
+                longhorn_namespace,
+                cert_manager_operator
+            ]
+        )
+
+        longhorn_root_domain = _root_domain(longhorn_config['LONGHORN_DOMAIN_NAME'])
+        longhorn_cert_manager_certificate = create_cert_manager_certificate(
+            slug="longhorn",
+            namespace="longhorn-system",
+            domain_name=longhorn_root_domain,
+            issuer_secret_name=longhorn_cert_manager_issuer.issuer_secret_name,
+            certificate_dns_names=[
+                longhorn_root_domain,
+                f"*.{longhorn_root_domain}",
+            ],
+            depends_on=[
+                longhorn_namespace,
+                longhorn_cert_manager_issuer,
+            ]
+        )
+        # Get disk configurations from config
+        longhorn_disks = longhorn_config.get('LONGHORN_DISKS', [])
+
+        # Ensure each disk has the correct node selector format
+        for disk in longhorn_disks:
+            node = disk.get('node')
+            node_selector = disk.get('node_selector')
+            # If node name is specified but not in the selector, add it
+            if node and (not node_selector or 'kubernetes.io/hostname' not in node_selector):
+                disk['node_selector'] = {**(node_selector or {}), 'kubernetes.io/hostname': node}
+
+        longhorn = create_longhorn(
+            slug="longhorn",
+            namespace="longhorn-system",
+            ingress_enabled=True,
+            ingress_host=longhorn_config['LONGHORN_DOMAIN_NAME'],
+            ingress_class_name="nginx",
+            ingress_tls_secret=longhorn_cert_manager_certificate.certificate_secret_name,
+            disks=longhorn_disks,
+            storage_classes=_LONGHORN_STORAGE_CLASSES,
+            depends_on=[
+                longhorn_namespace,
+                ingress_nginx,
+                longhorn_cert_manager_certificate,
+            ]
+        )
+        longhorn_stack = (
             longhorn_namespace,
             longhorn_cert_manager_issuer,
-        ]
-    )
-    # Get disk configurations from config
-    longhorn_disks = longhorn_config.get('LONGHORN_DISKS', [])
-
-    # Ensure each disk has the correct node selector format
-    for disk in longhorn_disks:
-        if 'node_selector' not in disk and 'kubernetes.io/hostname' not in disk.get('node_selector', {}):
-            # If node name is specified but not in the correct format, fix it
-            if 'node' in disk:
-                disk['node_selector'] = {'kubernetes.io/hostname': disk['node']}
-
-    # Define storage classes for different performance tiers
-    longhorn_storage_classes = [
-        {
-            "name": "longhorn-nvme",
-            "replica_count": 2,
-            "disk_selector": ["nvme"],
-            "is_default": True,
-            "reclaim_policy": "Retain",
-            "fs_type": "ext4"
-        },
-        {
-            "name": "longhorn-ssd",
-            "replica_count": 3,
-            "disk_selector": ["ssd"],
-            "is_default": False,
-            "reclaim_policy": "Retain",
-            "fs_type": "ext4"
-        },
-        {
-            "name": "longhorn-hdd",
-            "replica_count": 1,
-            "disk_selector": ["hdd"],
-            "is_default": False,
-            "reclaim_policy": "Retain",
-            "fs_type": "ext4"
-        }
-    ]
-
-    longhorn = create_longhorn(
-        slug="longhorn",
-        namespace="longhorn-system",
-        ingress_enabled=True,
-        ingress_host=longhorn_config['LONGHORN_DOMAIN_NAME'],
-        ingress_class_name="nginx",
-        ingress_tls_secret=longhorn_cert_manager_certificate.certificate_secret_name,
-        disks=longhorn_disks,
-        storage_classes=longhorn_storage_classes,
-        depends_on=[
-            longhorn_namespace,
-            ingress_nginx,
             longhorn_cert_manager_certificate,
-        ]
-    )
+            longhorn,
+        )
 
     # Rancher
-    rancher_config = config['components']['rancher']
-    rancher_namespace = create_namespace(
-        slug="rancher",
-        namespace="rancher",
-        depends_on=[]
-    )
-    rancher_cert_manager_issuer = create_cert_manager_issuer(
-        slug="rancher",
-        namespace="rancher",
-        cloudflare_email=env_vars['CLOUDFLARE_EMAIL'],
-        cloudflare_api_token=env_vars['CLOUDFLARE_API_TOKEN'],
-        depends_on=[
-            rancher_namespace,
-            cert_manager_operator
-        ]
-    )
-
-    rancher_root_domain = '.'.join(rancher_config['RANCHER_DOMAIN_NAME'].split('.')[1:])
-    rancher_cert_manager_certificate = create_cert_manager_certificate(
-        slug="rancher",
-        namespace="rancher",
-        domain_name=rancher_root_domain,
-        issuer_secret_name=rancher_cert_manager_issuer.issuer_secret_name,
-        certificate_dns_names=[
-            rancher_root_domain,
-            f"*.{rancher_root_domain}",
-        ],
-        depends_on=[
-            rancher_namespace,
-            rancher_cert_manager_issuer,
-        ]
-    )
-    rancher = create_rancher(
-        slug="rancher",
-        namespace="rancher",
-        hostname=rancher_config['RANCHER_DOMAIN_NAME'],
-        replicas=3,
-        bootstrap_password=rancher_config['RANCHER_BOOTSTRAP_PASSWORD'],
-        certificate_secret_name=rancher_cert_manager_certificate.certificate_secret_name,
-        ingress_class_name="nginx",
-        extra_env_vars=[],
-        depends_on=[
+    rancher_stack = ()
+    if _component_enabled(config, 'rancher'):
+        rancher_config = config['components']['rancher']
+        rancher_namespace = create_namespace(
+            slug="rancher",
+            namespace="rancher",
+            depends_on=[]
+        )
+        rancher_cert_manager_issuer = create_cert_manager_issuer(
+            slug="rancher",
+            namespace="rancher",
+            depends_on=[
+                rancher_namespace,
+                cert_manager_operator
+            ]
+        )
+
+        rancher_root_domain = _root_domain(rancher_config['RANCHER_DOMAIN_NAME'])
+        rancher_cert_manager_certificate = create_cert_manager_certificate(
+            slug="rancher",
+            namespace="rancher",
+            domain_name=rancher_root_domain,
+            issuer_secret_name=rancher_cert_manager_issuer.issuer_secret_name,
+            certificate_dns_names=[
+                rancher_root_domain,
+                f"*.{rancher_root_domain}",
+            ],
+            depends_on=[
+                rancher_namespace,
+                rancher_cert_manager_issuer,
+            ]
+        )
+        rancher = create_rancher(
+            slug="rancher",
+            namespace="rancher",
+            hostname=rancher_config['RANCHER_DOMAIN_NAME'],
+            replicas=3,
+            bootstrap_password=rancher_config['RANCHER_BOOTSTRAP_PASSWORD'],
+            certificate_secret_name=rancher_cert_manager_certificate.certificate_secret_name,
+            ingress_class_name="nginx",
+            extra_env_vars=[],
+            depends_on=[
+                rancher_namespace,
+                rancher_cert_manager_issuer,
+                rancher_cert_manager_certificate,
+                ingress_nginx,
+                *longhorn_stack[-1:],  # Longhorn, when enabled
+            ]
+        )
+        rancher_stack = (
             rancher_namespace,
             rancher_cert_manager_issuer,
             rancher_cert_manager_certificate,
-            ingress_nginx,
-            longhorn,
-        ]
-    )
+            rancher,
+        )
+
+    # PostgreSQL Operator, also needed by the WhatsApp WAHA database
+    whatsapp_waha_enabled = _component_enabled(config, 'whatsapp_waha')
+    postgresql_stack = ()
+    if _component_enabled(config, 'postgresql') or whatsapp_waha_enabled:
+        postgresql_namespace_name = "postgresql-system"
+        postgresql_namespace = create_namespace(
+            slug="postgresql",
+            namespace=postgresql_namespace_name,
+            depends_on=[]
+        )
+
+        postgresql_operator_crds = create_postgresql_operator_crds(
+            slug="postgresql-crds",
+            namespace=postgresql_namespace_name,
+            depends_on=[
+                postgresql_namespace
+            ]
+        )
+
+        postgresql_operator = create_postgresql_operator(
+            slug="postgresql-operator",
+            namespace=postgresql_namespace_name,
+            depends_on=[
+                postgresql_namespace,
+                postgresql_operator_crds
+            ]
+        )
+        postgresql_stack = (postgresql_namespace, postgresql_operator_crds, postgresql_operator)
 
-    # PostgreSQL Operator
-    postgresql_namespace_name = "postgresql-system"
-    postgresql_namespace = create_namespace(
-        slug="postgresql",
-        namespace=postgresql_namespace_name,
-        depends_on=[]
-    )
-    
-    postgresql_operator_crds = create_postgresql_operator_crds(
-        slug="postgresql-crds",
-        namespace=postgresql_namespace_name,
-        depends_on=[
-            postgresql_namespace
-        ]
-    )
-    
-    postgresql_operator = create_postgresql_operator(
-        slug="postgresql-operator",
-        namespace=postgresql_namespace_name,
-        depends_on=[
-            postgresql_namespace,
-            postgresql_operator_crds
-        ]
-    )
-    
-    
     # Whatsapp WAHA
-    whatsapp_waha_config = config['components']['whatsapp_waha']
-    
-    # WhatsApp WAHA PostgreSQL Instance
-    whatsapp_db_config = whatsapp_waha_config.get('postgres_db', {})
-    whatsapp_waha_namespace_name = "whatsapp"
-
-    whatsapp_waha_namespace = create_namespace(
-        slug=whatsapp_waha_namespace_name,
-        namespace=whatsapp_waha_namespace_name,
-        depends_on=[]
-    )
-    
-    whatsapp_waha_postgres_instance = create_postgres_instance_base(
-        slug="whatsapp-db",
-        namespace=whatsapp_waha_namespace_name,
-        db_name=whatsapp_db_config['db_name'],
-        superuser=whatsapp_db_config['superuser'],
-        superuser_password=whatsapp_db_config['superuser_password'],
-        username=whatsapp_db_config['username'],
-        user_password=whatsapp_db_config['password'],
-        replicas=whatsapp_db_config.get('replicas', 1),
-        storage_size=whatsapp_db_config.get('storage_size', '5Gi'),
-        wal_storage_size=whatsapp_db_config.get('wal_storage_size', '1Gi'),
-        repo_storage_size=whatsapp_db_config.get('repo_storage_size', '2Gi'),
-        s3_backup=whatsapp_db_config.get('s3_backup', None),
-        s3_bootstrap=whatsapp_db_config.get('s3_bootstrap', None),
-        service_type=whatsapp_db_config.get('service_type', 'LoadBalancer'),
-        service_annotations=whatsapp_db_config.get('service_annotations', {}),
-        depends_on=[
-            whatsapp_waha_namespace,  # Depend on WhatsApp namespace
-            postgresql_operator_crds,
-            postgresql_operator
-        ]
-    )
-    whatsapp_waha_domain_name=whatsapp_waha_config['domain_name']
-    whatsapp_waha_root_domain = '.'.join(whatsapp_waha_domain_name.split('.')[1:])
-
-    whatsapp_waha_cert_manager_issuer = create_cert_manager_issuer(
-        slug="whatsapp-waha-issuer",
-        namespace=whatsapp_waha_namespace_name,
-        cloudflare_email=env_vars['CLOUDFLARE_EMAIL'],
-        cloudflare_api_token=env_vars['CLOUDFLARE_API_TOKEN'],
-        depends_on=[
-            whatsapp_waha_namespace
-        ]
-    )
-
-    whatsapp_waha_cert_manager_certificate = create_cert_manager_certificate(
-        slug="whatsapp-waha-certificate",
-        namespace=whatsapp_waha_namespace_name,
-        domain_name=whatsapp_waha_domain_name,
-        issuer_secret_name=whatsapp_waha_cert_manager_issuer.issuer_secret_name,
-        certificate_dns_names=[
-            whatsapp_waha_root_domain,
-            f"*.{whatsapp_waha_root_domain}",
-        ],
-        depends_on=[
+    whatsapp_waha_stack = ()
+    if whatsapp_waha_enabled:
+        whatsapp_waha_config = config['components']['whatsapp_waha']
+
+        # WhatsApp WAHA PostgreSQL Instance
+        whatsapp_db_config = whatsapp_waha_config.get('postgres_db', {})
+        whatsapp_waha_namespace_name = "whatsapp"
+
+        whatsapp_waha_namespace = create_namespace(
+            slug=whatsapp_waha_namespace_name,
+            namespace=whatsapp_waha_namespace_name,
+            depends_on=[]
+        )
+
+        whatsapp_waha_postgres_instance = create_postgres_instance_base(
+            slug="whatsapp-db",
+            namespace=whatsapp_waha_namespace_name,
+            db_name=whatsapp_db_config['db_name'],
+            superuser=whatsapp_db_config['superuser'],
+            superuser_password=whatsapp_db_config['superuser_password'],
+            username=whatsapp_db_config['username'],
+            user_password=whatsapp_db_config['password'],
+            **{key: whatsapp_db_config.get(key, default) for key, default in _POSTGRES_DEFAULTS.items()},
+            depends_on=[
+                whatsapp_waha_namespace,  # Depend on WhatsApp namespace
+                postgresql_operator_crds,
+                postgresql_operator
+            ]
+        )
+        whatsapp_waha_domain_name=whatsapp_waha_config['domain_name']
+        whatsapp_waha_root_domain = _root_domain(whatsapp_waha_domain_name)
+
+        whatsapp_waha_cert_manager_issuer = create_cert_manager_issuer(
+            slug="whatsapp-waha-issuer",
+            namespace=whatsapp_waha_namespace_name,
+            depends_on=[
+                whatsapp_waha_namespace
+            ]
+        )
+
+        whatsapp_waha_cert_manager_certificate = create_cert_manager_certificate(
+            slug="whatsapp-waha-certificate",
+            namespace=whatsapp_waha_namespace_name,
+            domain_name=whatsapp_waha_domain_name,
+            issuer_secret_name=whatsapp_waha_cert_manager_issuer.issuer_secret_name,
+            certificate_dns_names=[
+                whatsapp_waha_root_domain,
+                f"*.{whatsapp_waha_root_domain}",
+            ],
+            depends_on=[
+                whatsapp_waha_namespace,
+                whatsapp_waha_cert_manager_issuer,
+            ]
+        )
+
+        whatsapp_waha = create_whatsapp_waha(
+            slug="whatsapp",
+            namespace=whatsapp_waha_namespace_name,
+            image_repository="devlikeapro/waha",
+            image_tag="latest",
+            replicas=1,
+            env_vars={},
+            postgres_uri=whatsapp_waha_postgres_instance.normal_user_postgres_uri,
+            s3_storage=whatsapp_waha_config.get('s3_storage', None),
+            ingress_enabled=True,
+            ingress_host=whatsapp_waha_domain_name,
+            ingress_class_name="nginx",
+            ingress_tls_secret=whatsapp_waha_cert_manager_certificate.certificate_secret_name,
+            basic_auth_enabled=True,
+            username=whatsapp_waha_config['username'],
+            password=whatsapp_waha_config['password'],
+            depends_on=[
+                whatsapp_waha_namespace,
+                whatsapp_waha_cert_manager_certificate,
+                whatsapp_waha_cert_manager_issuer,
+                whatsapp_waha_postgres_instance,
+            ]
+        )
+        whatsapp_waha_stack = (
             whatsapp_waha_namespace,
             whatsapp_waha_cert_manager_issuer,
-        ]
-    )
-    
-    whatsapp_waha = create_whatsapp_waha(
-        slug="whatsapp",
-        namespace=whatsapp_waha_namespace_name,
-        image_repository="devlikeapro/waha",
-        image_tag="latest",
-        replicas=1,
-        env_vars={},
-        postgres_uri=whatsapp_waha_postgres_instance.normal_user_postgres_uri,
-        s3_storage=whatsapp_waha_config.get('s3_storage', None),
-        ingress_enabled=True,
-        ingress_host=whatsapp_waha_domain_name,
-        ingress_class_name="nginx",
-        ingress_tls_secret=whatsapp_waha_cert_manager_certificate.certificate_secret_name,
-        basic_auth_enabled=True,
-        username=whatsapp_waha_config['username'],
-        password=whatsapp_waha_config['password'],
-        depends_on=[
-            whatsapp_waha_namespace,
             whatsapp_waha_cert_manager_certificate,
-            whatsapp_waha_cert_manager_issuer,
             whatsapp_waha_postgres_instance,
-        ]
-    )
+            whatsapp_waha,
+        )
 
     # registry = create_registry(
     #     slug="registry",
@@ -375,86 +414,42 @@ def generate_all_skaffolds():
     # )
 
     # Cloudflare Tunnel
-    cloudflare_tunnel_config = config['components'].get('cloudflare_tunnel', {})
-    cloudflare_tunnel_namespace_name = cloudflare_tunnel_config.get('namespace', 'cloudflare-tunnel')
-    cloudflare_tunnel_namespace = create_namespace(
-        slug="cloudflare-tunnel",
-        namespace=cloudflare_tunnel_namespace_name,
-        depends_on=[]
-    )
-
-    cloudflare_tunnel = create_cloudflare_tunnel(
-        slug="cloudflare-tunnel",
-        namespace=cloudflare_tunnel_namespace_name,
-        token=cloudflare_tunnel_config['token'],
-        replicas=cloudflare_tunnel_config.get('replicas', 2),
-        image_repository=cloudflare_tunnel_config.get('image_repository', 'cloudflare/cloudflared'),
-        image_tag=cloudflare_tunnel_config.get('image_tag', 'latest'),
-        env_vars=cloudflare_tunnel_config.get('env_vars', {}),
-        depends_on=[
-            cloudflare_tunnel_namespace,
-        ]
-    )
-
-    # Collect all components
-    components = [
-        # Fix some limits on the host
-        increase_fs_watchers_limit,
-
-        # Cert-manager
-        cert_manager_namespace,
-        cert_manager_operator,
-
-        # MetalLB
-        metallb_namespace,
-        metallb,
-
-        # Ingress Nginx
-        ingress_nginx_namespace,
-        ingress_nginx,
-
-        # Longhorn
-        longhorn_namespace,
-        longhorn_cert_manager_issuer,
-        longhorn_cert_manager_certificate,
-        longhorn,
-
-        # Rancher
-        rancher_namespace,
-        rancher_cert_manager_issuer,
-        rancher_cert_manager_certificate,
-        rancher,
-
-        # Cloudflare tunnel
-        cloudflare_tunnel_namespace,
-        cloudflare_tunnel,
-
-        # PostgreSQL Operator
-        postgresql_namespace,
-        postgresql_operator_crds,
-        postgresql_operator,
-        
-        # WhatsApp WAHA
-        whatsapp_waha_namespace,
-        whatsapp_waha_cert_manager_issuer,
-        whatsapp_waha_cert_manager_certificate,
-        whatsapp_waha_postgres_instance,
-        whatsapp_waha,
-
-    ]
-
-    # Generate skaffold configurations
-    generate_skaffolds(
-        components=components,
-    )
-
-    # Generate IntelliJ run configurations if enabled
-    if INTELLIJ_RUN_CONFIGURATIONS_ENABLED or env_vars['INTELLIJ_RUN_CONFIGURATIONS_ENABLED'].lower() == 'true':
-        generate_intelij_skaffolds_run_configurations()
-
-    # Sync generated files to the final directory
-    subprocess.call(["rsync", "-rcvu", "--delete", f"{GENERATED_SKAFFOLD_TMP_DIR}/", f"{GENERATED_SKAFFOLD_DIR}/"])
-    subprocess.call(["rm", "-rf", f"{GENERATED_SKAFFOLD_TMP_DIR}/"])
+    cloudflare_tunnel_stack = ()
+    if _component_enabled(config, 'cloudflare_tunnel'):
+        cloudflare_tunnel_config = config['components'].get('cloudflare_tunnel', {})
+        cloudflare_tunnel_namespace_name = cloudflare_tunnel_config.get('namespace', 'cloudflare-tunnel')
+        cloudflare_tunnel_namespace = create_namespace(
+            slug="cloudflare-tunnel",
+            namespace=cloudflare_tunnel_namespace_name,
+            depends_on=[]
+        )
+
+        cloudflare_tunnel = create_cloudflare_tunnel(
+            slug="cloudflare-tunnel",
+            namespace=cloudflare_tunnel_namespace_name,
+            token=cloudflare_tunnel_config['token'],
+            replicas=cloudflare_tunnel_config.get('replicas', 2),
+            image_repository=cloudflare_tunnel_config.get('image_repository', 'cloudflare/cloudflared'),
+            image_tag=cloudflare_tunnel_config.get('image_tag', 'latest'),
+            env_vars=cloudflare_tunnel_config.get('env_vars', {}),
+            depends_on=[
+                cloudflare_tunnel_namespace,
+            ]
+        )
+        cloudflare_tunnel_stack = (cloudflare_tunnel_namespace, cloudflare_tunnel)
+
+    # Collect all components, in deployment order
+    return list(chain(
+        core_stack,
+        cert_manager_stack,
+        metallb_stack,
+        ingress_nginx_stack,
+        longhorn_stack,
+        rancher_stack,
+        cloudflare_tunnel_stack,
+        postgresql_stack,
+        whatsapp_waha_stack,
+    ))
 
 
 if __name__ == '__main__':